@@ -2,11 +2,13 @@
 # Copyright (C) 2026 arfelious
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from functools import lru_cache
 from pathlib import Path
 
 __version__ = "1.0.0"
 
 
+@lru_cache(maxsize=1)
 def get_data_dir() -> Path:
     """Root directory for driver sources, assets, and LICENSE (for installs)."""
     env = __import__("os").environ.get("OMEN_FAN_CONTROL_DIR")
@@ -4,41 +4,55 @@
 
 import os
 import sys
-from pathlib import Path
+import time
 
 import click
 
-from . import get_data_dir
-from .logic import FanController
+from . import __version__
+from .launcher import PROG_NAME, show_about, show_acknowledgements, show_help_extra, show_license
+from .logic import SYSTEM_CONFIG_FILE, ConfigWatcher, FanController
+
+
+# Option types shared by the options/settings decorators
+_ON_OFF = click.Choice(["on", "off"])
+_INTERP = click.Choice(["smooth", "discrete"])
+_PROFILE = click.Choice(["omen", "victus", "victus_s"])
 
 
 @click.group()
+@click.version_option(__version__, prog_name=PROG_NAME)
 @click.option("--config", type=click.Path(), help="Path to custom config file")
 @click.option("--help-extra", is_flag=True, help="Show extra/advanced commands help")
 @click.pass_context
 def cli(ctx, config, help_extra):
     """HP Omen Fan Control CLI"""
     if help_extra:
-        click.echo("Extra / Advanced Commands:")
-        click.echo("  disable-bios   Disable BIOS fan control (writes to EC)")
-        click.echo("  enable-bios    Enable BIOS fan control (writes to EC)")
-        click.echo("\n  Note: Disabling BIOS control is usually unnecessary as the driver handles overrides.")
+        show_help_extra()
         ctx.exit()
     ctx.ensure_object(dict)
     ctx.obj["config_path"] = config
-    controller = FanController(config_path=config)
-    if os.geteuid() != 0 and not controller.config.get("bypass_root_warning", False):
+
+
+def _ensure_bootstrap(ctx):
+    """Show root/board warnings once, only when a command actually needs the controller."""
+    if ctx.obj.get("bootstrapped"):
+        return
+    ctx.obj["bootstrapped"] = True
+    # The command needs the controller anyway, so its config is parsed once and shared
+    controller = _controller(ctx)
+    config = controller.config
+    if os.geteuid() != 0 and not config.get("bypass_root_warning", False):
         click.echo(click.style("WARNING: Running without root privileges.", fg="yellow"))
         click.echo(click.style("Most commands require root to function correctly.", fg="yellow"))
         click.echo(click.style("Use 'omen-fan-control options' to set bypass_root_warning in config to hide this.", dim=True))
         click.echo("", err=True)
-    if not controller.config.get("bypass_warning", False):
+    if not config.get("bypass_warning", False):
         status, board = controller.check_board_support()
         if status == "UNSUPPORTED":
             click.echo(click.style(f"WARNING: Your board '{board}' is not in the known compatible list.", fg="red"))
             click.echo(click.style("Using this tool could potentially cause system instability.", fg="red"))
             click.echo("To bypass this warning, set 'bypass_warning' to true in config or toggle in GUI.")
-        elif status == "POSSIBLY_SUPPORTED" and not controller.config.get("enable_experimental", False):
+        elif status == "POSSIBLY_SUPPORTED" and not config.get("enable_experimental", False):
             click.echo(click.style(f"NOTE: Your board '{board}' is valid for experimental support.", fg="yellow"))
             click.echo(click.style("Community patches suggest it uses the Omen thermal path.", fg="yellow"))
             click.echo("You can enable experimental support in the GUI Settings or by editing config.json:")
@@ -46,10 +60,18 @@ def cli(ctx, config, help_extra):
             click.echo("")
 
 
+def _controller(ctx):
+    # One controller per invocation, shared by the bootstrap checks and the command
+    if ctx.obj.get("controller") is None:
+        ctx.obj["controller"] = FanController(config_path=ctx.obj.get("config_path"))
+    return ctx.obj["controller"]
+
+
 def get_controller():
     ctx = click.get_current_context()
-    config_path = ctx.obj.get("config_path") if ctx.obj else None
-    return FanController(config_path=config_path)
+    ctx.ensure_object(dict)
+    _ensure_bootstrap(ctx)
+    return _controller(ctx)
 
 
 @cli.command()
@@ -61,13 +83,14 @@ def calibrate():
         controller.config["mode"] = "calibration"
         controller.save_config()
         try:
-            gen = controller.calibrate()
+            # fan_max is persisted together with the mode restore below
+            gen = controller.calibrate(save=False)
             max_rpm = 0
             try:
                 while True:
                     progress = next(gen)
-                    click.echo(f"Calibrating... {progress}%", nl=False)
-                    click.echo("\r", nl=False)
+                    sys.stdout.write(f"Calibrating... {progress}%\r")
+                    sys.stdout.flush()
             except StopIteration as e:
                 max_rpm = e.value
             click.echo(f"\nCalibration finished. Max RPM: {max_rpm}")
@@ -76,6 +99,28 @@ def calibrate():
             controller.save_config()
 
 
+# mode -> (FanController method, banner)
+_INSTALL_MODES = {
+    "temp": ("install_driver_temp", "Installing temporary driver..."),
+    "perm": ("install_driver_perm", "Installing permanent driver..."),
+    "restore": ("restore_driver", "Restoring original driver..."),
+}
+_INSTALL_TYPE_ALIASES = {
+    "t": "temp", "temp": "temp", "temporary": "temp",
+    "p": "perm", "perm": "perm", "permanent": "perm",
+    "r": "restore", "restore": "restore",
+}
+
+
+def _retry_with_force(controller, method):
+    """Ask before re-installing over an active driver; returns the forced result, or None if declined."""
+    itype = controller.check_install_type()
+    msg_add = "\n(The current installation may be temporary)" if itype == "temporary" else ""
+    if click.confirm(f"Driver seems to be already active/installed.{msg_add}\nForce re-install?"):
+        return method(force=True)
+    return None
+
+
 @cli.command()
 @click.argument("install_type", required=False)
 @click.option("--temp", is_flag=True, help="Legacy: Install temporarily")
@@ -87,53 +132,28 @@ def install_patch(install_type, temp, perm, restore):
     INSTALL_TYPE: t|temp|temporary, p|perm|permanent, r|restore
     """
     controller = get_controller()
-    mode = None
-    if install_type:
-        install_type = install_type.lower()
-        if install_type in ("t", "temp", "temporary"):
-            mode = "temp"
-        elif install_type in ("p", "perm", "permanent"):
-            mode = "perm"
-        elif install_type in ("r", "restore"):
-            mode = "restore"
+    mode = _INSTALL_TYPE_ALIASES.get(install_type.lower()) if install_type else None
     if not mode:
-        if temp:
-            mode = "temp"
-        elif perm:
-            mode = "perm"
-        elif restore:
-            mode = "restore"
+        mode = "temp" if temp else "perm" if perm else "restore" if restore else None
     if not mode:
         click.echo("Please specify: t (temp), p (perm), or r (restore). Example: omen-fan-control install-patch permanent")
         return
-    if mode == "temp":
-        click.echo("Installing temporary driver...")
-        success, msg = controller.install_driver_temp()
-        if not success and msg == "PWM_DETECTED":
-            itype = controller.check_install_type()
-            msg_add = "\n(The current installation may be temporary)" if itype == "temporary" else ""
-            if click.confirm(f"Driver seems to be already active/installed.{msg_add}\nForce re-install?"):
-                success, msg = controller.install_driver_temp(force=True)
-        click.echo(msg)
-        if not success:
-            sys.exit(1)
-    elif mode == "perm":
-        click.echo("Installing permanent driver...")
-        success, msg = controller.install_driver_perm()
-        if not success and msg == "PWM_DETECTED":
-            itype = controller.check_install_type()
-            msg_add = "\n(The current installation may be temporary)" if itype == "temporary" else ""
-            if click.confirm(f"Driver seems to be already active/installed.{msg_add}\nForce re-install?"):
-                success, msg = controller.install_driver_perm(force=True)
-        click.echo(msg)
-        if not success:
-            sys.exit(1)
-    elif mode == "restore":
-        click.echo("Restoring original driver...")
-        success, msg = controller.restore_driver()
-        click.echo(msg)
-        if not success:
-            sys.exit(1)
+    method_name, banner = _INSTALL_MODES[mode]
+    method = getattr(controller, method_name)
+    click.echo(banner)
+    success, msg = method()
+    if not success and msg == "PWM_DETECTED":
+        success, msg = _retry_with_force(controller, method) or (success, msg)
+    click.echo(msg)
+    if not success:
+        sys.exit(1)
+
+
+FAN_CONTROL_USAGE = """Usage: omen-fan-control fan-control [--mode MODE] [--value VALUE] [--curve-csv FILE] [set]
+  --mode auto|max|manual|curve|last  Fan mode ('last' loads from config)
+  --value 0-255 | 0-100%             Manual speed, e.g. --value 50%
+  --curve-csv FILE                   Load a temp,percent curve (implies curve mode)
+  set                                Re-apply the last saved mode"""
 
 
 @cli.command()
@@ -149,12 +169,11 @@ def fan_control(mode, value, curve_csv, action):
         elif action == "set":
             mode = "last"
         else:
-            ctx = click.get_current_context()
-            click.echo(ctx.get_help())
-            ctx.exit()
+            # Static text instead of ctx.get_help(); --help itself is still rendered by Click
+            click.echo(FAN_CONTROL_USAGE)
+            return
     controller = get_controller()
-    default_conf = Path("/etc/omen-fan-control/config.json")
-    if controller.is_service_running() and controller.config_path.resolve() != default_conf.resolve():
+    if controller.is_service_running() and controller.resolved_config_path != SYSTEM_CONFIG_FILE.resolve():
         click.echo(click.style("WARNING: Background service is active using system config.", fg="yellow"))
         click.echo(click.style(f"It may overwrite changes from {controller.config_path.name}.", fg="yellow"))
         click.echo("Suggestion: Stop the service before testing custom configs.\n")
@@ -168,7 +187,7 @@ def fan_control(mode, value, curve_csv, action):
         controller.set_fan_mode("max")
         click.echo("Fan set to MAX.")
     elif mode == "manual":
-        if not (controller.pwm1_path and controller.pwm1_path.exists()):
+        if not controller.pwm1_available:
             click.echo("Error: Manual mode requires the kernel driver patch. Run 'omen-fan-control install-patch perm'.")
             sys.exit(1)
         if value is None:
@@ -197,28 +216,22 @@ def fan_control(mode, value, curve_csv, action):
             click.echo(f"Error: Invalid value '{value}'. Use 0-255 or '50%'.")
             return
     elif mode == "curve":
-        if not (controller.pwm1_path and controller.pwm1_path.exists()):
+        if not controller.pwm1_available:
             click.echo("Error: Curve mode requires the kernel driver patch. Run 'omen-fan-control install-patch perm'.")
             sys.exit(1)
         if curve_csv:
-            points = []
             try:
                 with open(curve_csv, "r") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or line.startswith("#") or "," not in line:
-                            continue
-                        parts = line.split(",")
-                        if len(parts) >= 2:
-                            temp, speed = int(parts[0].strip()), int(parts[1].strip())
-                            if not (0 <= speed <= 100):
-                                click.echo(f"Error: Speed {speed} must be 0-100%.")
-                                return
-                            points.append([temp, speed])
+                    rows = [line.split(",", 2) for line in f if "," in line and not line.lstrip().startswith("#")]
+                # int() tolerates the surrounding whitespace/newline, so fields need no strip()
+                points = sorted(([int(r[0]), int(r[1])] for r in rows), key=lambda x: x[0])
+                bad_speed = next((p[1] for p in points if not 0 <= p[1] <= 100), None)
+                if bad_speed is not None:
+                    click.echo(f"Error: Speed {bad_speed} must be 0-100%.")
+                    return
                 if not points:
                     click.echo("Error: No valid points in CSV.")
                     return
-                points.sort(key=lambda x: x[0])
                 controller.config["curve"] = points
                 click.echo(f"Loaded {len(points)} points from CSV.")
             except Exception as e:
@@ -237,44 +250,55 @@ def fan_control(mode, value, curve_csv, action):
 @cli.command()
 def serve():
     """Run the fan control daemon (foreground). Used by systemd service."""
-    import time
+    import collections
     controller = get_controller()
     click.echo("Starting Omen Fan Control Daemon...")
     ma_window = controller.config.get("ma_window", 5)
-    temp_history = []
+    # Rolling sum over the window keeps the moving average O(1) per tick
+    temp_history = collections.deque(maxlen=ma_window)
+    temp_sum = 0
     watchdog_interval = controller.config.get("watchdog_interval", 90)
     last_watchdog_time = time.time()
     hysteresis_start_time = None
-    last_config_mtime = 0
+    watcher = ConfigWatcher(controller.config_path)
+    reload_config = False
+    config_dirty = True
     while True:
         try:
-            try:
-                current_mtime = controller.config_path.stat().st_mtime
-                if current_mtime > last_config_mtime:
-                    controller.config = controller.load_config()
-                    last_config_mtime = current_mtime
-            except Exception:
-                pass
-            mode = controller.config.get("mode", "auto")
+            if reload_config:
+                # A half-written or hand-broken file keeps the running settings instead of resetting to defaults
+                controller.config = controller.load_config(fallback=controller.config)
+                reload_config = False
+                config_dirty = True
+            # Settings only change on reload, so keep them in locals instead of dict lookups every tick
+            if config_dirty:
+                cfg = controller.config
+                mode = cfg.get("mode", "auto")
+                fan_max = cfg.get("fan_max", 0)
+                manual_val = cfg.get("manual_pwm", -1)
+                if cfg.get("ma_window", 5) != ma_window:
+                    ma_window = cfg.get("ma_window", 5)
+                    temp_history = collections.deque(temp_history, maxlen=ma_window)
+                    temp_sum = sum(temp_history)
+                config_dirty = False
             if mode == "calibration":
-                time.sleep(1)
+                reload_config = watcher.wait(1)
                 continue
             if time.time() - last_watchdog_time > watchdog_interval:
                 last_watchdog_time = time.time()
-            current_temp = controller.get_cpu_temp()
+            current_temp = controller.read_tick_temp()
+            if len(temp_history) == ma_window:
+                temp_sum -= temp_history[0]
             temp_history.append(current_temp)
-            if len(temp_history) > ma_window:
-                temp_history.pop(0)
-            avg_temp = sum(temp_history) / len(temp_history)
+            temp_sum += current_temp
+            avg_temp = temp_sum / len(temp_history)
             if mode == "curve":
                 target_pwm = controller.calculate_target_pwm(avg_temp)
                 if target_pwm is not None:
-                    current_rpm = controller.get_fan_speed()
-                    max_rpm = controller.config.get("fan_max", 0)
                     should_apply = True
-                    if max_rpm > 0:
-                        target_rpm = (target_pwm / 255) * max_rpm
-                        diff = abs(target_rpm - current_rpm)
+                    if fan_max > 0:
+                        target_rpm = (target_pwm / 255) * fan_max
+                        diff = abs(target_rpm - controller.read_tick_rpm())
                         if diff <= 200:
                             if hysteresis_start_time is None:
                                 hysteresis_start_time = time.time()
@@ -285,27 +309,27 @@ def serve():
                         controller.set_fan_pwm(target_pwm)
                         hysteresis_start_time = None
             elif mode == "manual":
-                manual_val = controller.config.get("manual_pwm", -1)
                 if manual_val >= 0:
                     controller.set_fan_pwm(manual_val)
             elif mode == "max":
                 controller.set_fan_mode("max")
             elif mode == "auto":
                 controller.set_fan_mode("auto")
-            time.sleep(2)
+            reload_config = watcher.wait(2)
         except KeyboardInterrupt:
             click.echo("Stopping daemon...")
             break
         except Exception as e:
             click.echo(f"Error in daemon loop: {e}")
-            time.sleep(5)
+            reload_config = watcher.wait(5) or reload_config
+    watcher.close()
+    controller.close()
 
 
 @cli.command()
 @click.argument("duration", required=True)
 def stress(duration):
     """Run CPU stress test. DURATION: 30s, 1m, 5m, 1h."""
-    import time
     controller = get_controller()
     try:
         s = duration.lower().strip()
@@ -328,8 +352,8 @@ def stress(duration):
         try:
             start = time.time()
             while time.time() - start < seconds:
-                click.echo(f"Time remaining: {seconds - int(time.time() - start)}s   ", nl=False)
-                click.echo("\r", nl=False)
+                sys.stdout.write(f"Time remaining: {seconds - int(time.time() - start)}s   \r")
+                sys.stdout.flush()
                 time.sleep(1)
         except KeyboardInterrupt:
             click.echo("\nStress test cancelled.")
@@ -340,19 +364,22 @@ def stress(duration):
         click.echo("Failed to start stress test.")
 
 
+# Every options flag defaults to None, so "nothing passed" is a single tuple comparison
+_NO_OPTIONS = (None,) * 7
+
+
 @cli.command()
 @click.option("--wait-time", type=int, required=False, is_flag=False, flag_value=-1)
 @click.option("--watchdog", type=int, required=False, is_flag=False, flag_value=-1)
 @click.option("--ma-window", type=int, required=False, is_flag=False, flag_value=-1)
-@click.option("--bypass-warning", type=click.Choice(["on", "off"]), required=False, is_flag=False, flag_value="show")
-@click.option("--curve-interpolation", type=click.Choice(["smooth", "discrete"]), required=False, is_flag=False, flag_value="show")
-@click.option("--enable-experimental", type=click.Choice(["on", "off"]), required=False, is_flag=False, flag_value="show")
-@click.option("--thermal-profile", type=click.Choice(["omen", "victus", "victus_s"]), required=False, is_flag=False, flag_value="show")
+@click.option("--bypass-warning", type=_ON_OFF, required=False, is_flag=False, flag_value="show")
+@click.option("--curve-interpolation", type=_INTERP, required=False, is_flag=False, flag_value="show")
+@click.option("--enable-experimental", type=_ON_OFF, required=False, is_flag=False, flag_value="show")
+@click.option("--thermal-profile", type=_PROFILE, required=False, is_flag=False, flag_value="show")
 def options(wait_time, watchdog, ma_window, bypass_warning, curve_interpolation, enable_experimental, thermal_profile):
     """Configure or view options. Run with no args to view all."""
     controller = get_controller()
-    opts = [wait_time, watchdog, ma_window, bypass_warning, curve_interpolation, enable_experimental, thermal_profile]
-    if all(x is None for x in opts):
+    if (wait_time, watchdog, ma_window, bypass_warning, curve_interpolation, enable_experimental, thermal_profile) == _NO_OPTIONS:
         wt = controller.config.get("calibration_wait", 5)
         wd = controller.config.get("watchdog_interval", 90)
         mw = controller.config.get("ma_window", 5)
@@ -423,47 +450,40 @@ def options(wait_time, watchdog, ma_window, bypass_warning, curve_interpolation,
         controller.save_config()
 
 
-@cli.group()
-def service():
-    """Manage background service"""
-    pass
-
-
-@service.command(name="install")
-def install_service_cmd():
-    """Install and enable the background service"""
-    controller = get_controller()
-    click.echo("Installing background service...")
-    success, msg = controller.create_service()
-    click.echo(msg)
-
-
-@service.command(name="remove")
-def remove_service_cmd():
-    """Stop and remove the background service"""
-    controller = get_controller()
-    click.echo("Removing background service...")
-    success, msg = controller.remove_service()
-    click.echo(msg)
-
-
-@service.command(name="restart")
-def restart_service_cmd():
-    """Restart the background service"""
+# action -> (FanController method, banner, help); "status" is handled separately
+_SERVICE_ACTIONS = {
+    "install": ("create_service", "Installing background service...", "Install and enable the background service"),
+    "remove": ("remove_service", "Removing background service...", "Stop and remove the background service"),
+    "restart": ("restart_service", "Restarting background service...", "Restart the background service"),
+}
+_SERVICE_HELP = "\n".join([
+    "Manage background service.",
+    "",
+    "\b",
+    "Actions:",
+    *(f"  {name:<9}{text}" for name, (_, _, text) in _SERVICE_ACTIONS.items()),
+    f"  {'status':<9}Check service status",
+])
+
+
+@cli.command(help=_SERVICE_HELP)
+@click.argument("action", required=False, metavar="[ACTION]", type=click.Choice([*_SERVICE_ACTIONS, "status"]))
+@click.pass_context
+def service(ctx, action):
+    if action is None:
+        click.echo(ctx.get_help())
+        return
     controller = get_controller()
-    click.echo("Restarting background service...")
-    success, msg = controller.restart_service()
+    if action == "status":
+        click.echo(f"Service Installed: {'Yes' if controller.is_service_installed() else 'No'}")
+        click.echo(f"Service Running:   {'Yes' if controller.is_service_running() else 'No'}")
+        return
+    method, banner, _ = _SERVICE_ACTIONS[action]
+    click.echo(banner)
+    success, msg = getattr(controller, method)()
     click.echo(msg)
 
 
-@service.command(name="status")
-def service_status_cmd():
-    """Check service status"""
-    controller = get_controller()
-    click.echo(f"Service Installed: {'Yes' if controller.is_service_installed() else 'No'}")
-    click.echo(f"Service Running:   {'Yes' if controller.is_service_running() else 'No'}")
-
-
 @cli.command()
 def status():
     """Show system status (Temps, Fan, Service)"""
@@ -530,8 +550,8 @@ def enable_bios():
 @click.option("--wait-time", type=int, required=False, is_flag=False, flag_value=-1)
 @click.option("--watchdog", type=int, required=False, is_flag=False, flag_value=-1)
 @click.option("--ma-window", type=int, required=False, is_flag=False, flag_value=-1)
-@click.option("--bypass-warning", type=click.Choice(["on", "off"]), required=False, is_flag=False, flag_value="show")
-@click.option("--curve-interpolation", type=click.Choice(["smooth", "discrete"]), required=False, is_flag=False, flag_value="show")
+@click.option("--bypass-warning", type=_ON_OFF, required=False, is_flag=False, flag_value="show")
+@click.option("--curve-interpolation", type=_INTERP, required=False, is_flag=False, flag_value="show")
 @click.pass_context
 def settings(ctx, wait_time, watchdog, ma_window, bypass_warning, curve_interpolation):
     """Alias for options"""
@@ -541,30 +561,19 @@ def settings(ctx, wait_time, watchdog, ma_window, bypass_warning, curve_interpol
 @cli.command()
 def license():
     """Show license"""
-    license_path = get_data_dir() / "LICENSE.md"
-    try:
-        click.echo(license_path.read_text())
-    except Exception as e:
-        click.echo("This program is GPL-3.0-or-later licensed.")
-        click.echo(f"(Error loading LICENSE: {e})")
+    show_license()
 
 
 @cli.command()
 def about():
     """Show about information"""
-    click.echo("HP Omen Fan Control")
-    click.echo("Version 1.0")
-    click.echo("Copyright © 2026 Arfelious")
-    click.echo("\nCustom fan control for HP Omen laptops on Linux.")
+    show_about()
 
 
 @cli.command()
 def acknowledgements():
     """Show acknowledgements"""
-    click.echo("\nAcknowledgements:\n")
-    click.echo("Probes: https://github.com/alou-S/omen-fan/blob/main/docs/probes.md")
-    click.echo("Linux 6.20 HP-WMI: https://git.kernel.org/pub/scm/linux/kernel/git/pdx86/platform-drivers-x86.git/commit/?h=for-next&id=46be1453e6e61884b4840a768d1e8ffaf01a4c1c")
-    click.echo("")
+    show_acknowledgements()
 
 
 def main():
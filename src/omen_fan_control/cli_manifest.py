@@ -0,0 +1,72 @@
+# Omen Fan Control CLI manifest
+# Copyright (C) 2026 arfelious
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Root-level help data, rendered by the launcher without importing click.
+# Keep in sync with the group options and command docstrings in cli.py;
+# `python -m omen_fan_control.cli_manifest --check` reports any drift.
+
+import sys
+
+DESCRIPTION = "HP Omen Fan Control CLI"
+
+OPTIONS = (
+    ("--version", "Show the version and exit."),
+    ("--config PATH", "Path to custom config file"),
+    ("--help-extra", "Show extra/advanced commands help"),
+    ("--help", "Show this message and exit."),
+)
+
+COMMANDS = (
+    ("about", "Show about information"),
+    ("acknowledgements", "Show acknowledgements"),
+    ("calibrate", "Run fan calibration to determine max RPM."),
+    ("fan-control", "Control fan mode and speed."),
+    ("install-patch", "Install the fan driver patch or restore original."),
+    ("license", "Show license"),
+    ("options", "Configure or view options."),
+    ("serve", "Run the fan control daemon (foreground)."),
+    ("service", "Manage background service."),
+    ("settings", "Alias for options"),
+    ("status", "Show system status (Temps, Fan, Service)"),
+    ("stress", "Run CPU stress test."),
+)
+
+EXTRA_COMMANDS = (
+    ("disable-bios", "Disable BIOS fan control (writes to EC)"),
+    ("enable-bios", "Enable BIOS fan control (writes to EC)"),
+)
+
+
+def check():
+    """Compare the manifest with the click group in cli.py; returns a list of mismatch descriptions."""
+    import click
+
+    from .cli import cli
+
+    ctx = click.Context(cli, info_name="omen-fan-control")
+    problems = []
+
+    def compare(what, manifest, actual):
+        manifest, actual = list(manifest), list(actual)
+        problems.extend(f"{what}: manifest has {item!r}, cli.py does not" for item in manifest if item not in actual)
+        problems.extend(f"{what}: cli.py has {item!r}, manifest does not" for item in actual if item not in manifest)
+        if sorted(manifest) == sorted(actual) and manifest != actual:
+            problems.append(f"{what}: same entries in a different order than cli.py")
+
+    compare("description", [DESCRIPTION], [cli.help])
+    compare("options", OPTIONS, [param.get_help_record(ctx) for param in cli.get_params(ctx)])
+    commands = [cli.get_command(ctx, name) for name in cli.list_commands(ctx)]
+    compare("commands", COMMANDS, [(cmd.name, cmd.get_short_help_str(limit=1000)) for cmd in commands if not cmd.hidden])
+    # Extra command texts are curated (they warn about EC writes), so only the names must match
+    compare("extra commands", [name for name, _ in EXTRA_COMMANDS], [cmd.name for cmd in commands if cmd.hidden])
+    return problems
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["--check"]:
+        sys.exit("usage: python -m omen_fan_control.cli_manifest --check")
+    problems = check()
+    for problem in problems:
+        print(problem)
+    sys.exit(1 if problems else 0)
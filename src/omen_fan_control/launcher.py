@@ -0,0 +1,111 @@
+# Omen Fan Control CLI launcher
+# Copyright (C) 2026 arfelious
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Kept free of click and logic imports: root help and static commands are answered
+# from here before the full CLI is loaded.
+
+import os
+import sys
+
+from . import __version__, get_data_dir
+from .cli_manifest import COMMANDS, DESCRIPTION, EXTRA_COMMANDS, OPTIONS
+
+PROG_NAME = "omen-fan-control"
+DEFAULT_PYCACHE = "/var/cache/omen-fan-control/pycache"
+
+
+def _rows(pairs):
+    width = max(len(name) for name, _ in pairs) + 2
+    return [f"  {name:<{width}}{text}" for name, text in pairs]
+
+
+def show_help():
+    print(f"Usage: {PROG_NAME} [OPTIONS] COMMAND [ARGS]...")
+    print(f"\n  {DESCRIPTION}\n")
+    print("Options:")
+    print("\n".join(_rows(OPTIONS)))
+    print("\nCommands:")
+    print("\n".join(_rows(COMMANDS)))
+
+
+def show_help_extra():
+    print("Extra / Advanced Commands:")
+    print("\n".join(_rows(EXTRA_COMMANDS)))
+    print("\n  Note: Disabling BIOS control is usually unnecessary as the driver handles overrides.")
+
+
+def show_version():
+    print(f"{PROG_NAME}, version {__version__}")
+
+
+def show_license():
+    license_path = get_data_dir() / "LICENSE.md"
+    try:
+        print(license_path.read_text())
+    except Exception as e:
+        print("This program is GPL-3.0-or-later licensed.")
+        print(f"(Error loading LICENSE: {e})")
+
+
+def show_about():
+    print("HP Omen Fan Control")
+    print("Version 1.0")
+    print("Copyright © 2026 Arfelious")
+    print("\nCustom fan control for HP Omen laptops on Linux.")
+
+
+def show_acknowledgements():
+    print("\nAcknowledgements:\n")
+    print("Probes: https://github.com/alou-S/omen-fan/blob/main/docs/probes.md")
+    print("Linux 6.20 HP-WMI: https://git.kernel.org/pub/scm/linux/kernel/git/pdx86/platform-drivers-x86.git/commit/?h=for-next&id=46be1453e6e61884b4840a768d1e8ffaf01a4c1c")
+    print("")
+
+
+STATIC_COMMANDS = {
+    "--help": show_help,
+    "--help-extra": show_help_extra,
+    "--version": show_version,
+    "license": show_license,
+    "about": show_about,
+    "acknowledgements": show_acknowledgements,
+}
+
+
+def _set_pycache_prefix():
+    """Share one bytecode cache when the package cannot cache its own. OMEN_FAN_PYCACHE=0 disables it."""
+    prefix = os.environ.get("OMEN_FAN_PYCACHE", DEFAULT_PYCACHE)
+    # An explicit PYTHONPYCACHEPREFIX / -X pycache_prefix wins
+    if prefix == "0" or sys.pycache_prefix or not sys.implementation.cache_tag:
+        return
+    # Precompiled bytecode next to the package, or a __pycache__ Python can fill itself, needs no redirect
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    package_cache = os.path.join(package_dir, "__pycache__")
+    if os.path.exists(os.path.join(package_cache, f"cli.{sys.implementation.cache_tag}.pyc")):
+        return
+    if os.access(package_cache if os.path.isdir(package_cache) else package_dir, os.W_OK):
+        return
+    try:
+        os.makedirs(prefix, exist_ok=True)
+    except OSError:
+        return
+    # Only switch when we can populate it; otherwise every run would fall back to compiling from source
+    if os.access(prefix, os.W_OK):
+        sys.pycache_prefix = prefix
+
+
+def main():
+    argv = sys.argv[1:]
+    if not argv:
+        show_help()
+        sys.exit(0)
+    if len(argv) == 1 and argv[0] in STATIC_COMMANDS:
+        STATIC_COMMANDS[argv[0]]()
+        sys.exit(0)
+    _set_pycache_prefix()
+    from .cli import main as cli_main
+    cli_main()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,19 @@
 # Copyright (C) 2026 arfelious
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import bisect
+import copy
 import glob
 import json
 import math
+import operator
 import os
+import re
 import shutil
 import subprocess
 import sys
 import time
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 from . import OMEN_FAN_DIR
@@ -20,8 +25,12 @@ DRIVER_BUILD_DIR = OMEN_FAN_DIR / "hp-wmi-omen"
 # Constants
 HWMON_PATH_PATTERN = "/sys/devices/platform/hp-wmi/hwmon/*/"
 THERMAL_ZONE_PATH = "/sys/class/thermal/thermal_zone0/temp"
+ECIO_FILE = "/sys/kernel/debug/ec/ec0/io"
+EC_BYTE_0 = b"\x00"
+EC_BYTE_6 = b"\x06"
+SYSTEM_CONFIG_FILE = Path("/etc/omen-fan-control/config.json")
 if os.geteuid() == 0:
-    CONFIG_DIR = Path("/etc/omen-fan-control")
+    CONFIG_DIR = SYSTEM_CONFIG_FILE.parent
 else:
     CONFIG_DIR = Path(os.path.expanduser("~/.config/omen-fan-control"))
 
@@ -29,6 +38,13 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 DEFAULT_CALIBRATION_WAIT = 30
 DEFAULT_WATCHDOG_INTERVAL = 90
 CONFIG_VERSION = 1
+# How long is-active / unit-file answers are reused, in seconds
+SERVICE_ACTIVE_TTL = 1.5
+SERVICE_INSTALLED_TTL = 30
+
+# Kernel release never changes while the process is alive; a bare uname(2), no `uname -r` fork or platform import
+_KERNEL_RELEASE = os.uname().release
+HP_DRIVER_DIR = Path(f"/lib/modules/{_KERNEL_RELEASE}/kernel/drivers/platform/x86/hp")
 
 # Supported Board IDs
 SUPPORTED_BOARDS = {
@@ -60,69 +76,304 @@ POSSIBLY_SUPPPORTED_OMEN_BOARDS = {
     "8CF4"
 }
 
+# Board id -> status in one table; SUPPORTED wins for boards listed in both sets
+BOARD_STATUS = {sys.intern(b): "SUPPORTED" for b in SUPPORTED_BOARDS}
+for _board in POSSIBLY_SUPPPORTED_OMEN_BOARDS:
+    BOARD_STATUS.setdefault(sys.intern(_board), "POSSIBLY_SUPPORTED")
+del _board
+
+# Parsed config per file within this process: abspath -> (mtime_ns, size, data)
+_CONFIG_CACHE = {}
+
+HWMON_CLASS_DIR = "/sys/class/hwmon"
+# Found hwmon nodes shared by every controller in the process: key -> (class dir mtime_ns, path)
+_HWMON_CACHE = {}
+# DMI board name, read at most once per process
+_BOARD_NAME_CACHE = None
+
+
+def get_board_status(board_name):
+    """Support status (SUPPORTED, POSSIBLY_SUPPORTED, UNSUPPORTED) of a DMI board name."""
+    return BOARD_STATUS.get(board_name, "UNSUPPORTED")
+
+
+def _resolve_hwmon(key, finder):
+    """Return finder()'s path, reusing the last found path while /sys/class/hwmon is unchanged and it still exists."""
+    try:
+        stamp = os.stat(HWMON_CLASS_DIR).st_mtime_ns
+    except OSError:
+        stamp = None
+    cached = _HWMON_CACHE.get(key)
+    if cached and stamp is not None and cached[0] == stamp and cached[1].exists():
+        return cached[1]
+    path = finder()
+    # A miss is never cached: kernfs need not bump the class dir mtime when a hwmon device registers later
+    if path is None:
+        _HWMON_CACHE.pop(key, None)
+    else:
+        _HWMON_CACHE[key] = (stamp, path)
+    return path
+
+
+MAX_RPM_DEFINE = b"#define OMEN_MAX_RPM 60"
+
+
+@lru_cache(maxsize=None)
+def _patch_pattern(target_array=None):
+    """Matches the stock max-RPM define and, if given, the body of target_array up to its closing '};'."""
+    pattern = re.escape(MAX_RPM_DEFINE)
+    if target_array:
+        pattern += b"|" + re.escape(f"{target_array}[]".encode()) + rb".*?(?=\};)"
+    return re.compile(pattern, re.DOTALL)
+
+
+def _stress_worker():
+    """Per-core stress loop: BLAS matmul keeps the FMA units busy when numpy is available,
+    otherwise a tight integer LCG pins the ALU without bignum allocator churn."""
+    # One worker already runs per core; a BLAS pool per worker would start cores² busy threads
+    for var in ("OPENBLAS_NUM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+    try:
+        import numpy as np
+    except ImportError:
+        x = 0
+        while True:
+            x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+    a = np.random.rand(512, 512).astype("f4")
+    while True:
+        a @ a
+
+
+def _read_node(path):
+    """Stripped contents of a small sysfs node, or None if it cannot be read."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 64).decode().strip()
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=None)
+def _which(name):
+    return shutil.which(name) or name
+
+
+def _run(cmd, **kwargs):
+    """subprocess.run for short-lived system tools (systemctl, modprobe, ...)."""
+    # CPython only uses posix_spawn (vfork) for an absolute executable with close_fds off; otherwise it fork()s
+    return subprocess.run([_which(cmd[0]), *cmd[1:]], close_fds=False, **kwargs)
+
+
+def _prepare_curve(curve):
+    """Sorted parallel xs/ys lists plus per-segment slopes for a list of [temp, percent] points."""
+    points = sorted(curve, key=lambda p: p[0])
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    # Duplicate temperatures are never picked as a bracket, so their slope is unused
+    slopes = [(ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i]) if xs[i + 1] != xs[i] else 0.0 for i in range(len(xs) - 1)]
+    return xs, ys, slopes
+
+
+def _eval_curve(xs, ys, slopes, t, discrete):
+    """Fan speed percent at temperature t for a curve prepared by _prepare_curve()."""
+    if t <= xs[0]:
+        return ys[0]
+    if t >= xs[-1]:
+        return ys[-1]
+    # Segment with xs[i] < t <= xs[i + 1]
+    i = bisect.bisect_left(xs, t) - 1
+    if discrete:
+        return ys[i]
+    return ys[i] + (t - xs[i]) * slopes[i]
+
+
+class ConfigWatcher:
+    """Reports changes to a config file: inotify on its directory, stat() polling if that is unavailable."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.fd = None
+        self._last_mtime = self._mtime()
+        # ctypes and struct are only needed by the daemon; keep them off the import path of every CLI command
+        import ctypes
+        import struct
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            # Watch the directory so editors that replace the file via rename are still seen.
+            # Only completed writes count: IN_MODIFY/IN_CREATE fire while the file is still truncated.
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+            if libc.inotify_add_watch(fd, os.fsencode(self.path.parent), mask) < 0:
+                os.close(fd)
+                return
+            self.fd = fd
+            # struct inotify_event header: wd, mask, cookie, len
+            self._event = struct.Struct("iIII")
+        except (OSError, AttributeError):
+            self.fd = None
+
+    def _mtime(self):
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _drain(self):
+        changed = False
+        name = os.fsencode(self.path.name)
+        while True:
+            try:
+                buf = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + self._event.size <= len(buf):
+                _, _, _, length = self._event.unpack_from(buf, offset)
+                offset += self._event.size
+                if buf[offset:offset + length].rstrip(b"\0") == name:
+                    changed = True
+                offset += length
+
+    def wait(self, timeout):
+        """Sleeps up to timeout seconds, returning early with True if the config file changed."""
+        if self.fd is None:
+            time.sleep(timeout)
+            mtime = self._mtime()
+            changed, self._last_mtime = mtime != self._last_mtime, mtime
+            return changed
+        import select
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if ready and self._drain():
+                return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
 
 class FanController:
     def __init__(self, config_path=None):
-        self._find_paths()
         if config_path:
             self.config_path = Path(config_path)
         else:
             self.config_path = CONFIG_FILE
         self.config = self.load_config()
+        self._board_support = None
+        self._install_type_cache = None
+        self._curve_cache = None
+        self._last_enable_mode = None
+        self._tick_fds = None
+        self._pwm_fd = None
+        self._svc_active_cache = None
+        self._svc_installed_cache = None
+
+    @cached_property
+    def resolved_config_path(self):
+        return self.config_path.resolve()
+
+    @property
+    def board_name(self):
+        return self.check_board_support()[1]
+
+    @cached_property
+    def exec_start(self):
+        # Through the launcher so the daemon uses the same bytecode cache as the CLI
+        return f"{sys.executable} -m omen_fan_control.launcher serve"
 
     def check_board_support(self):
         """Returns (status, board_name). status: SUPPORTED, POSSIBLY_SUPPORTED, UNSUPPORTED."""
+        # board_name is fixed by DMI, so the first answer holds for the lifetime of the controller
+        if self._board_support is not None:
+            return self._board_support
+        self._board_support = self._detect_board_support()
+        return self._board_support
+
+    def _detect_board_support(self):
+        global _BOARD_NAME_CACHE
         if self.config.get("cached_board_name"):
             board_name = self.config["cached_board_name"]
-        else:
+            return get_board_status(board_name), board_name
+        # An earlier controller in this process already found it: no file I/O at all
+        if _BOARD_NAME_CACHE is None:
             try:
                 with open("/sys/class/dmi/id/board_name", "r") as f:
-                    board_name = f.read().strip()
-                self.config["cached_board_name"] = board_name
-                self.save_config()
+                    _BOARD_NAME_CACHE = f.read().strip()
             except Exception as e:
                 print(f"Error reading board name: {e}")
                 return "UNSUPPORTED", "Unknown"
-        if board_name in SUPPORTED_BOARDS:
-            return "SUPPORTED", board_name
-        if board_name in POSSIBLY_SUPPPORTED_OMEN_BOARDS:
-            return "POSSIBLY_SUPPORTED", board_name
-        return "UNSUPPORTED", board_name
+        board_name = _BOARD_NAME_CACHE
+        # Kept in memory for the UI only; DMI is the source of truth, so no config rewrite
+        self.config["cached_board_name"] = board_name
+        return get_board_status(board_name), board_name
 
     def _find_paths(self):
-        self.cpu_temp_path = self._find_cpu_temp_path()
+        """Forget discovered sysfs paths so they are rescanned on next access (e.g. after a driver load)."""
+        for attr in ("hwmon_path", "pwm1_enable_path", "pwm1_path", "fan1_input_path", "pwm1_available", "cpu_temp_path"):
+            self.__dict__.pop(attr, None)
+        # An explicit rescan must not be answered from the process-wide cache
+        _HWMON_CACHE.clear()
+        self._last_enable_mode = None
+        self.close()
+
+    # sysfs paths are discovered lazily so commands that never touch the hardware skip the hwmon scan
+    @cached_property
+    def hwmon_path(self):
+        return _resolve_hwmon("hp", self._find_hwmon_path)
+
+    def _find_hwmon_path(self):
         paths = glob.glob(HWMON_PATH_PATTERN)
-        if not paths:
-            self.hwmon_path = None
-            self.pwm1_enable_path = None
-            self.pwm1_path = None
-            self.fan1_input_path = None
-            return
-        self.hwmon_path = Path(paths[0])
-        self.pwm1_enable_path = self.hwmon_path / "pwm1_enable"
-        self.pwm1_path = self.hwmon_path / "pwm1"
-        self.fan1_input_path = self.hwmon_path / "fan1_input"
-        self.cpu_temp_path = self._find_cpu_temp_path()
+        return Path(paths[0]) if paths else None
+
+    @cached_property
+    def pwm1_enable_path(self):
+        return self.hwmon_path / "pwm1_enable" if self.hwmon_path else None
+
+    @cached_property
+    def pwm1_path(self):
+        return self.hwmon_path / "pwm1" if self.hwmon_path else None
+
+    @cached_property
+    def fan1_input_path(self):
+        return self.hwmon_path / "fan1_input" if self.hwmon_path else None
+
+    @cached_property
+    def pwm1_available(self):
+        # Only driver install/restore changes this; they call _find_paths() to re-evaluate it
+        return bool(self.pwm1_path and self.pwm1_path.exists())
+
+    @cached_property
+    def cpu_temp_path(self):
+        return _resolve_hwmon("cpu", self._find_cpu_temp_path)
 
     def _find_cpu_temp_path(self):
-        for hwmon in Path("/sys/class/hwmon").glob("hwmon*"):
-            try:
-                name_path = hwmon / "name"
-                if not name_path.exists():
-                    continue
-                with open(name_path, "r") as f:
-                    name = f.read().strip()
-                if name in ["coretemp", "k10temp"]:
-                    temp_path = hwmon / "temp1_input"
-                    if temp_path.exists():
-                        return temp_path
-            except Exception:
-                continue
+        for hwmon in Path(HWMON_CLASS_DIR).glob("hwmon*"):
+            # One open per name node; a missing node just fails the open instead of costing an extra stat()
+            if _read_node(hwmon / "name") in ("coretemp", "k10temp"):
+                temp_path = hwmon / "temp1_input"
+                if temp_path.exists():
+                    return temp_path
         if Path("/sys/class/thermal/thermal_zone0/temp").exists():
             return Path("/sys/class/thermal/thermal_zone0/temp")
         return None
 
-    def load_config(self):
+    def load_config(self, fallback=None):
+        """Config merged over defaults. If the file exists but cannot be parsed, fallback (when given) is returned instead of the defaults."""
         defaults = {
             "version": CONFIG_VERSION,
             "fan_max": 0,
@@ -141,42 +392,103 @@ class FanController:
             "cached_board_name": None,
             "debug_experimental_ui": False,
         }
-        if not self.config_path.exists():
+        key = os.path.abspath(self.config_path)
+        try:
+            st = self.config_path.stat()
+        except FileNotFoundError:
+            _CONFIG_CACHE.pop(key, None)
+            return defaults
+        except OSError as e:
+            print(f"Error loading config: {e}")
             return defaults
         try:
-            with open(self.config_path, "r") as f:
-                data = json.load(f)
+            cached = _CONFIG_CACHE.get(key)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                data = cached[2]
+            else:
+                with open(self.config_path, "r") as f:
+                    data = json.load(f)
+                _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, data)
+            # Callers mutate their config (curve lists included), so never hand out the cached object
             config = defaults.copy()
-            config.update(data)
+            config.update(copy.deepcopy(data))
             return config
         except Exception as e:
             print(f"Error loading config: {e}")
-            return defaults
+            return defaults if fallback is None else fallback
 
     def save_config(self):
         if self.config_path.parent:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
         self.config["version"] = CONFIG_VERSION
-        with open(self.config_path, "w") as f:
-            json.dump(self.config, f, indent=4)
+        key = os.path.abspath(self.config_path)
+        # Nothing to encode or write when the file on disk already holds exactly this config
+        cached = _CONFIG_CACHE.get(key)
+        if cached and cached[2] == self.config:
+            try:
+                st = self.config_path.stat()
+                if cached[:2] == (st.st_mtime_ns, st.st_size):
+                    return
+            except OSError:
+                pass
+        # config.json stays pretty-printed since users are pointed at it for manual edits
+        payload = json.dumps(self.config, indent=4).encode()
+        # Write a sibling and rename over the config so a crash mid-write never leaves a truncated file
+        tmp_path = self.config_path.with_name(self.config_path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                # Keep the permissions of the file being replaced
+                os.fchmod(fd, os.stat(self.config_path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            # Saves are rare; without the fsync some filesystems can surface the rename before the data
+            os.fsync(fd)
+            os.close(fd)
+            fd = None
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        try:
+            st = self.config_path.stat()
+            _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, copy.deepcopy(self.config))
+        except OSError:
+            _CONFIG_CACHE.pop(key, None)
 
     def write_sys_file(self, path, value):
         if not path:
-            return
+            return False
         try:
             with open(path, "w") as f:
                 f.write(str(value))
+            return True
         except PermissionError:
             print(f"Permission denied writing to {path}. Are you running as root?")
         except Exception as e:
             print(f"Error writing to {path}: {e}")
+        return False
 
     def read_sys_file(self, path):
-        if not path or not path.exists():
+        if not path:
             return None
+        # Single open/read/close; a missing node surfaces as FileNotFoundError instead of a separate stat()
         try:
-            with open(path, "r") as f:
-                return f.read().strip()
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                return os.read(fd, 4096).decode().strip()
+            finally:
+                os.close(fd)
+        except FileNotFoundError:
+            return None
         except Exception as e:
             print(f"Error reading {path}: {e}")
             return None
@@ -191,20 +503,71 @@ class FanController:
             return int(val) // 1000 if val else 0
         return 0
 
+    def _pread_tick(self, slot, path):
+        """Integer in a sysfs node, read through an fd kept open across calls; None if it cannot be read."""
+        if self._tick_fds is None:
+            self._tick_fds = {}
+        fd = self._tick_fds.get(slot)
+        if fd is None:
+            if not path:
+                return None
+            try:
+                fd = self._tick_fds[slot] = os.open(path, os.O_RDONLY)
+            except OSError:
+                return None
+        try:
+            # sysfs regenerates the value on every read at offset 0, so pread needs no reopen or seek
+            return int(os.pread(fd, 32, 0))
+        except (OSError, ValueError):
+            # Only this node is reopened next time; the other fd stays valid
+            os.close(fd)
+            del self._tick_fds[slot]
+            return None
+
+    def close_tick_fds(self):
+        for fd in (self._tick_fds or {}).values():
+            os.close(fd)
+        self._tick_fds = None
+
+    def close(self):
+        """Close the sysfs descriptors kept open by read_tick_temp(), read_tick_rpm() and set_fan_pwm()."""
+        self.close_tick_fds()
+        if self._pwm_fd is not None and self._pwm_fd >= 0:
+            os.close(self._pwm_fd)
+        self._pwm_fd = None
+
+    def read_tick_temp(self):
+        """CPU temperature for the daemon loop, through a persistent fd."""
+        val = self._pread_tick("temp", self.cpu_temp_path)
+        return val // 1000 if val is not None else self.get_cpu_temp()
+
+    def read_tick_rpm(self):
+        """Fan RPM through a persistent fd. Each read is a WMI query, so only call it when the value is used."""
+        val = self._pread_tick("fan", self.fan1_input_path)
+        return val if val is not None else self.get_fan_speed()
+
     def get_all_core_temps(self):
+        # Package readings go straight into the result; only cores need sorting before they are appended
+        temps = []
         core_temps = []
-        package_temps = []
         if not self.cpu_temp_path:
             return []
-        hwmon_dir = self.cpu_temp_path.parent
-        for f in hwmon_dir.glob("temp*_input"):
+        # One directory listing classifies every node, then each is a bare open/read/close
+        try:
+            with os.scandir(self.cpu_temp_path.parent) as it:
+                entries = {e.name: e.path for e in it}
+        except OSError:
+            return []
+        for name, path in entries.items():
+            if not (name.startswith("temp") and name.endswith("_input")):
+                continue
             try:
-                label_file = f.with_name(f.name.replace("input", "label"))
-                label = self.read_sys_file(label_file) if label_file.exists() else f.name
-                val = self.read_sys_file(f)
+                val = _read_node(path)
                 if not val:
                     continue
                 temp = int(val) // 1000
+                label_path = entries.get(name[:-5] + "label")
+                label = (_read_node(label_path) if label_path else None) or name
                 if "Core" in label:
                     try:
                         idx = int(label.split()[-1])
@@ -212,51 +575,66 @@ class FanController:
                     except Exception:
                         core_temps.append((999, label, temp))
                 elif "Package" in label:
-                    package_temps.append((label, temp))
+                    temps.append((label, temp))
             except Exception:
                 continue
-        core_temps.sort(key=lambda x: x[0])
-        params = list(package_temps)
-        for c in core_temps:
-            params.append((c[1], c[2]))
-        return params
+        core_temps.sort(key=operator.itemgetter(0))
+        temps.extend((label, temp) for _, label, temp in core_temps)
+        return temps
+
+    def _write_enable_mode(self, value):
+        # Remember what we wrote so set_fan_pwm need not read pwm1_enable back; forget it on failure
+        ok = self.write_sys_file(self.pwm1_enable_path, value)
+        self._last_enable_mode = str(value).strip() if ok else None
 
     def set_fan_mode(self, mode):
         if mode == "max":
-            self.write_sys_file(self.pwm1_enable_path, 0)
+            self._write_enable_mode(0)
         elif mode == "auto":
-            self.write_sys_file(self.pwm1_enable_path, 2)
+            self._write_enable_mode(2)
 
     def set_fan_pwm(self, value):
-        current_enable = self.read_sys_file(self.pwm1_enable_path)
-        if current_enable != "1":
-            self.write_sys_file(self.pwm1_enable_path, 1)
-        self.write_sys_file(self.pwm1_path, str(int(value)))
-
-    def calculate_target_pwm(self, current_temp):
+        # Unknown mode (fresh controller or after a failure) just gets rewritten; no pwm1_enable readback
+        if self._last_enable_mode != "1":
+            self._write_enable_mode(1)
+        data = str(int(value))
+        # Keep pwm1 open between ticks; -1 marks a node we could not open (e.g. EACCES), which uses open-per-write
+        if self._pwm_fd is None and self.pwm1_path:
+            try:
+                self._pwm_fd = os.open(self.pwm1_path, os.O_WRONLY)
+            except OSError:
+                self._pwm_fd = -1
+        if self._pwm_fd is not None and self._pwm_fd >= 0:
+            try:
+                os.pwrite(self._pwm_fd, data.encode(), 0)
+                return
+            except OSError:
+                # e.g. ENODEV after the driver was unloaded; reopen on the next call
+                os.close(self._pwm_fd)
+                self._pwm_fd = None
+        if not self.write_sys_file(self.pwm1_path, data):
+            # The driver state is uncertain; re-assert manual mode on the next call
+            self._last_enable_mode = None
+
+    def _prepared_curve(self):
         curve = self.config.get("curve", [])
         if not curve:
             return None
-        curve = sorted(curve, key=lambda p: p[0])
-        target_speed_percent = 0
-        if current_temp <= curve[0][0]:
-            target_speed_percent = curve[0][1]
-        elif current_temp >= curve[-1][0]:
-            target_speed_percent = curve[-1][1]
-        else:
-            for i in range(len(curve) - 1):
-                p1, p2 = curve[i], curve[i + 1]
-                if p1[0] <= current_temp <= p2[0]:
-                    interp_mode = self.config.get("curve_interpolation", "smooth")
-                    if interp_mode == "discrete":
-                        target_speed_percent = p1[1]
-                    else:
-                        denom = p2[0] - p1[0]
-                        target_speed_percent = p2[1] if denom == 0 else p1[1] + (current_temp - p1[0]) / denom * (p2[1] - p1[1])
-                    break
-        return int(round(target_speed_percent / 100 * 255))
+        # Sort and precompute slopes once per curve object instead of on every tick
+        if self._curve_cache is None or self._curve_cache[0] is not curve:
+            self._curve_cache = (curve, *_prepare_curve(curve))
+        return self._curve_cache[1:]
 
-    def calibrate(self):
+    def calculate_target_pwm(self, current_temp):
+        prepared = self._prepared_curve()
+        if prepared is None:
+            return None
+        discrete = self.config.get("curve_interpolation", "smooth") == "discrete"
+        return int(round(_eval_curve(*prepared, current_temp, discrete) / 100 * 255))
+
+    def calibrate(self, save=True, cancel_event=None):
+        """Generator yielding progress percent; returns max RPM. save=False leaves persisting fan_max to the caller.
+        Setting cancel_event (a threading.Event) stops early, restores the fan and returns None without touching fan_max."""
         print("Starting calibration...")
         try:
             prev_enable = self.read_sys_file(self.pwm1_enable_path) or "2"
@@ -265,16 +643,36 @@ class FanController:
             prev_enable, prev_pwm = "2", "0"
         self.set_fan_mode("max")
         wait_time = self.config.get("calibration_wait", DEFAULT_CALIBRATION_WAIT)
-        steps = 10
-        for i in range(steps):
-            time.sleep(wait_time / steps)
-            yield int((i + 1) / steps * 100)
-        max_rpm = self.get_fan_speed()
-        self.config["fan_max"] = max_rpm
-        self.save_config()
+        # Progress is derived from a monotonic deadline, so the total wait does not drift with scheduling jitter
+        start = time.monotonic()
+        deadline = start + wait_time
+        last_pct = None
+        cancelled = False
+        while True:
+            now = time.monotonic()
+            pct = 100 if wait_time <= 0 else min(100, int((now - start) / wait_time * 100))
+            if pct != last_pct:
+                yield pct
+                last_pct = pct
+            if now >= deadline:
+                break
+            step = min(0.25, deadline - now)
+            # Event.wait doubles as the sleep, so a cancel is noticed immediately rather than after the step
+            if cancel_event is not None:
+                if cancel_event.wait(step):
+                    cancelled = True
+                    break
+            else:
+                time.sleep(step)
+        max_rpm = None
+        if not cancelled:
+            max_rpm = self.get_fan_speed()
+            self.config["fan_max"] = max_rpm
+            if save:
+                self.save_config()
         try:
             if prev_enable:
-                self.write_sys_file(self.pwm1_enable_path, prev_enable)
+                self._write_enable_mode(prev_enable)
             if prev_pwm and str(prev_enable).strip() == "1":
                 self.write_sys_file(self.pwm1_path, prev_pwm)
         except Exception as e:
@@ -286,38 +684,52 @@ class FanController:
         target_file = DRIVER_BUILD_DIR / "hp-wmi.c"
         if not orig_file.exists():
             if target_file.exists():
-                shutil.copy(target_file, orig_file)
+                shutil.copyfile(target_file, orig_file)
             else:
                 return False, "Error: hp-wmi.c not found."
-        with open(orig_file, "r") as f:
-            content = f.read()
-        max_rpm_val = math.floor(fan_max / 100)
-        content = content.replace("#define OMEN_MAX_RPM 60", f"#define OMEN_MAX_RPM {max_rpm_val}")
+        max_rpm_define = f"#define OMEN_MAX_RPM {math.floor(fan_max / 100)}".encode()
+        target_array = board_entry = insertion = None
         if self.config.get("enable_experimental", False):
-            board_name = self.config.get("cached_board_name") or self.check_board_support()[1]
+            board_name = self.board_name
             if board_name and board_name != "Unknown":
                 profile = self.config.get("thermal_profile", "omen")
                 target_array = {"victus": "victus_thermal_profile_boards", "victus_s": "victus_s_thermal_profile_boards"}.get(profile, "omen_thermal_profile_boards")
-                start_idx = content.find(f"{target_array}[]")
-                if start_idx != -1:
-                    end_idx = content.find("};", start_idx)
-                    if end_idx != -1:
-                        segment = content[start_idx:end_idx]
-                        if f'"{board_name}"' not in segment:
-                            if target_array == "victus_s_thermal_profile_boards":
-                                insertion = (
-                                    '        {\n            .matches = {DMI_MATCH(DMI_BOARD_NAME, "%s")},\n'
-                                    '            .driver_data = (void *)&victus_s_thermal_params,\n        },\n'
-                                ) % board_name
-                            else:
-                                insertion = f'\t"{board_name}",\n'
-                            content = content[:end_idx] + insertion + content[end_idx:]
-        with open(target_file, "w") as f:
-            f.write(content)
+                if target_array == "victus_s_thermal_profile_boards":
+                    insertion = (
+                        '        {\n            .matches = {DMI_MATCH(DMI_BOARD_NAME, "%s")},\n'
+                        '            .driver_data = (void *)&victus_s_thermal_params,\n        },\n'
+                    ) % board_name
+                else:
+                    insertion = f'\t"{board_name}",\n'
+                insertion = insertion.encode()
+                board_entry = f'"{board_name}"'.encode()
+        # Scan the mapped original once and stream unchanged spans straight to the target,
+        # rewriting the define and appending the board to the first matching array
+        import mmap
+        array_seen = False
+        try:
+            with open(orig_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as src, \
+                    open(target_file, "wb") as out, memoryview(src) as view:
+                pos = 0
+                for m in _patch_pattern(target_array).finditer(src):
+                    out.write(view[pos:m.start()])
+                    text = m.group(0)
+                    if text == MAX_RPM_DEFINE:
+                        out.write(max_rpm_define)
+                    else:
+                        out.write(text)
+                        if not array_seen and board_entry not in text:
+                            out.write(insertion)
+                        array_seen = True
+                    pos = m.end()
+                out.write(view[pos:])
+        except ValueError:
+            # mmap refuses empty files
+            return False, "Error: hp-wmi.c.orig is empty."
         return True, "Patch applied successfully."
 
     def install_driver_temp(self, force=False):
-        if self.pwm1_path and self.pwm1_path.exists():
+        if self.pwm1_available:
             if not force and not self.config.get("bypass_patch_warning", False):
                 return False, "PWM_DETECTED"
         fan_max = self.config.get("fan_max", 0)
@@ -333,23 +745,24 @@ class FanController:
         ko_files = list(DRIVER_BUILD_DIR.glob("*.ko"))
         if not ko_files:
             return False, "Error: No .ko file found after make."
-        subprocess.run(["modprobe", "-r", "hp-wmi"], check=False)
+        _run(["modprobe", "-r", "hp-wmi"], check=False)
         try:
-            subprocess.run(["modprobe", "sparse_keymap"], check=True, capture_output=True, text=True)
+            _run(["modprobe", "sparse_keymap"], check=True, capture_output=True, text=True)
         except subprocess.CalledProcessError as e:
             return False, f"Modprobe sparse_keymap failed: {e.stderr}"
         try:
-            subprocess.run(["insmod", str(ko_files[0])], check=True, capture_output=True, text=True)
+            _run(["insmod", str(ko_files[0])], check=True, capture_output=True, text=True)
         except subprocess.CalledProcessError as e:
-            subprocess.run(["modprobe", "hp-wmi"], check=False)
+            _run(["modprobe", "hp-wmi"], check=False)
             return False, f"Insmod failed: {e.stderr}\n(Original driver re-loaded attempts)"
         subprocess.run(["make", "clean"], check=True, cwd=DRIVER_BUILD_DIR)
         self.config["install_type"] = "temporary"
         self.save_config()
+        self._find_paths()
         return True, "Temporary driver installed successfully."
 
     def install_driver_perm(self, force=False):
-        if self.pwm1_path and self.pwm1_path.exists():
+        if self.pwm1_available:
             if not force and not self.config.get("bypass_patch_warning", False):
                 return False, "PWM_DETECTED"
         fan_max = self.config.get("fan_max", 0)
@@ -364,32 +777,48 @@ class FanController:
             return False, f"Install script failed: {e.stderr}"
         self.config["install_type"] = "permanent"
         self.save_config()
+        self._find_paths()
         return True, "Permanent driver installed successfully."
 
     def check_install_type(self):
-        if not (self.pwm1_path and self.pwm1_path.exists()):
+        if not self.pwm1_available:
             return None
         conf_type = self.config.get("install_type")
         if conf_type in ("permanent", "temporary"):
             return conf_type
         try:
-            kernel_ver = subprocess.check_output(["uname", "-r"]).decode().strip()
-            hp_driver_dir = Path(f"/lib/modules/{kernel_ver}/kernel/drivers/platform/x86/hp")
-            if hp_driver_dir.exists() and list(hp_driver_dir.glob("*.bak")):
-                return "permanent"
+            mtime = HP_DRIVER_DIR.stat().st_mtime_ns
+        except OSError:
+            return "temporary"
+        # Backups are only added/removed by renames inside the dir, which bump its mtime
+        if self._install_type_cache and self._install_type_cache[0] == mtime:
+            return self._install_type_cache[1]
+        try:
+            install_type = "permanent" if any(HP_DRIVER_DIR.glob("*.bak")) else "temporary"
         except Exception:
-            pass
-        return "temporary"
+            install_type = "temporary"
+        self._install_type_cache = (mtime, install_type)
+        return install_type
 
     def start_stress_test(self, duration_sec, core_count=None):
-        import sys as _sys
         core_count = core_count or os.cpu_count() or 4
         self.stop_stress_test()
         self.stress_processes = []
-        cmd = [_sys.executable, "-c", "while True: 9999**9999"]
+        stress_ng = shutil.which("stress-ng")
         try:
+            if stress_ng:
+                # A single stress-ng process drives all cores with a deterministic native load
+                cmd = [stress_ng, "--cpu", str(core_count), "--cpu-method", "matrixprod"]
+                self.stress_processes.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=False))
+                return True
+            import multiprocessing
+            # The GUI calls this from a threaded Qt process, where a plain fork() is unsafe.
+            # forkserver pays interpreter startup once, then forks each worker from a clean single-threaded server.
+            ctx = multiprocessing.get_context("forkserver")
             for _ in range(core_count):
-                self.stress_processes.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+                p = ctx.Process(target=_stress_worker, daemon=True)
+                p.start()
+                self.stress_processes.append(p)
             return True
         except Exception as e:
             print(f"Error starting stress test: {e}")
@@ -405,35 +834,39 @@ class FanController:
             except Exception:
                 pass
         for p in self.stress_processes:
-            try:
-                p.wait(timeout=0.1)
-            except subprocess.TimeoutExpired:
-                p.kill()
+            if isinstance(p, subprocess.Popen):
+                try:
+                    p.wait(timeout=0.1)
+                except subprocess.TimeoutExpired:
+                    p.kill()
+            else:
+                p.join(timeout=0.1)
+                if p.is_alive():
+                    p.kill()
+                    p.join()
         self.stress_processes = []
         print("Stopped stress test.")
 
     def set_bios_control(self, enabled):
         try:
-            subprocess.run(["modprobe", "ec_sys", "write_support=1"], check=True)
+            _run(["modprobe", "ec_sys", "write_support=1"], check=True)
         except Exception as e:
             print(f"Failed to load ec_sys: {e}")
             return False
-        ECIO_FILE = "/sys/kernel/debug/ec/ec0/io"
         try:
-            with open(ECIO_FILE, "r+b") as ec:
+            fd = os.open(ECIO_FILE, os.O_RDWR)
+            try:
+                # Unbuffered positional writes: each byte reaches the EC before the next step
                 if not enabled:
-                    ec.seek(98)
-                    ec.write(bytes([6]))
+                    os.pwrite(fd, EC_BYTE_6, 98)
                     time.sleep(0.1)
-                    ec.seek(99)
-                    ec.write(bytes([0]))
+                    os.pwrite(fd, EC_BYTE_0, 99)
                 else:
-                    ec.seek(98)
-                    ec.write(bytes([0]))
-                    ec.seek(52)
-                    ec.write(bytes([0]))
-                    ec.seek(53)
-                    ec.write(bytes([0]))
+                    os.pwrite(fd, EC_BYTE_0, 98)
+                    os.pwrite(fd, EC_BYTE_0, 52)
+                    os.pwrite(fd, EC_BYTE_0, 53)
+            finally:
+                os.close(fd)
             return True
         except Exception as e:
             print(f"Error setting BIOS control: {e}")
@@ -446,99 +879,121 @@ class FanController:
         try:
             if unit_lib.exists():
                 # Package-installed unit: just enable and start, do not overwrite
-                subprocess.run(["systemctl", "daemon-reload"], check=True)
-                subprocess.run(["systemctl", "enable", "omen-fan-control.service"], check=True)
-                subprocess.run(["systemctl", "start", "omen-fan-control.service"], check=True)
+                _run(["systemctl", "daemon-reload"], check=True)
+                _run(["systemctl", "enable", "--now", "omen-fan-control.service"], check=True)
                 return True, "Service enabled and started."
             template_path = Path(__file__).parent / "data" / "omen-fan-control.service"
             if not template_path.exists():
                 return False, f"Service template not found: {template_path}"
-            exec_start = f"{sys.executable} -m omen_fan_control.cli serve"
-            service_content = template_path.read_text().replace("@EXECSTART@", exec_start)
+            service_content = template_path.read_text().replace("@EXECSTART@", self.exec_start)
             with open(unit_etc, "w") as f:
                 f.write(service_content)
-            subprocess.run(["systemctl", "daemon-reload"], check=True)
-            subprocess.run(["systemctl", "enable", "omen-fan-control.service"], check=True)
-            subprocess.run(["systemctl", "start", "omen-fan-control.service"], check=True)
+            _run(["systemctl", "daemon-reload"], check=True)
+            _run(["systemctl", "enable", "--now", "omen-fan-control.service"], check=True)
             return True, "Service created and started."
         except Exception as e:
             return False, f"Failed to create service: {e}"
+        finally:
+            self.invalidate_service_cache()
 
     def remove_service(self):
         try:
-            subprocess.run(["systemctl", "stop", "omen-fan-control.service"], check=False)
-            subprocess.run(["systemctl", "disable", "omen-fan-control.service"], check=False)
+            _run(["systemctl", "disable", "--now", "omen-fan-control.service"], check=False)
             unit_etc = Path("/etc/systemd/system/omen-fan-control.service")
+            # Only a unit file we wrote ourselves needs systemd to re-read its configuration
             if unit_etc.exists():
                 unit_etc.unlink()
-            subprocess.run(["systemctl", "daemon-reload"], check=True)
+                _run(["systemctl", "daemon-reload"], check=True)
             return True, "Service removed."
         except Exception as e:
             return False, f"Failed to remove service: {e}"
+        finally:
+            self.invalidate_service_cache()
 
     def restart_service(self):
         """Restart the systemd service."""
         try:
-            subprocess.run(["systemctl", "restart", "omen-fan-control.service"], check=True)
+            _run(["systemctl", "restart", "omen-fan-control.service"], check=True)
             return True, "Service restarted."
         except Exception as e:
             return False, f"Failed to restart service: {e}"
+        finally:
+            self.invalidate_service_cache()
+
+    def invalidate_service_cache(self):
+        """Forget cached service state; called after anything that installs, removes or restarts the unit."""
+        self._svc_active_cache = None
+        self._svc_installed_cache = None
 
     def is_service_installed(self):
-        return (
+        # GUI refreshes poll this; the unit files only change through create/remove_service
+        now = time.monotonic()
+        if self._svc_installed_cache and now - self._svc_installed_cache[0] < SERVICE_INSTALLED_TTL:
+            return self._svc_installed_cache[1]
+        installed = (
             Path("/etc/systemd/system/omen-fan-control.service").exists()
             or Path("/usr/lib/systemd/system/omen-fan-control.service").exists()
         )
+        self._svc_installed_cache = (now, installed)
+        return installed
 
     def is_service_running(self):
+        # Short TTL so repeated status checks within one refresh share a single systemctl fork
+        now = time.monotonic()
+        if self._svc_active_cache and now - self._svc_active_cache[0] < SERVICE_ACTIVE_TTL:
+            return self._svc_active_cache[1]
         try:
-            res = subprocess.run(["systemctl", "is-active", "omen-fan-control.service"], capture_output=True, text=True)
-            return res.stdout.strip() == "active"
+            res = _run(["systemctl", "is-active", "omen-fan-control.service"], capture_output=True, text=True)
+            running = res.stdout.strip() == "active"
         except Exception:
-            return False
+            running = False
+        self._svc_active_cache = (now, running)
+        return running
 
     def restore_driver(self):
         messages = []
         dkms_name, dkms_version = "hp-wmi-omen", "1.0"
         try:
             try:
-                result = subprocess.run(["dkms", "status"], capture_output=True, text=True)
+                result = _run(["dkms", "status"], capture_output=True, text=True)
                 if dkms_name in result.stdout:
-                    subprocess.run(["dkms", "remove", f"{dkms_name}/{dkms_version}", "--all"], check=False)
+                    _run(["dkms", "remove", f"{dkms_name}/{dkms_version}", "--all"], check=False)
                     messages.append("Removed DKMS module.")
             except FileNotFoundError:
                 pass
             for d in [Path(f"/usr/src/{dkms_name}-{dkms_version}"), Path(f"/usr/src/{dkms_name}")]:
                 if d.exists() and dkms_name in str(d):
-                    subprocess.run(["rm", "-rf", str(d)], check=False)
+                    shutil.rmtree(d, ignore_errors=True)
             for hook in ["/etc/pacman.d/hooks/90-hp-wmi-omen.hook", "/etc/kernel/postinst.d/zz-hp-wmi-omen", "/etc/kernel/install.d/99-hp-wmi-omen.install"]:
                 if Path(hook).exists():
                     Path(hook).unlink()
                     messages.append(f"Removed hook: {Path(hook).name}")
-            kernel_ver = subprocess.check_output(["uname", "-r"]).decode().strip()
             restored_count = 0
-            for search_dir in [Path(f"/lib/modules/{kernel_ver}/kernel/drivers/platform/x86/hp"), Path(f"/lib/modules/{kernel_ver}/updates")]:
-                if search_dir.exists():
-                    for bak_file in search_dir.rglob("*.bak"):
-                        target = bak_file.parent / bak_file.stem
-                        subprocess.run(["mv", str(bak_file), str(target)], check=True)
-                        restored_count += 1
+            for search_dir in [HP_DRIVER_DIR, Path(f"/lib/modules/{_KERNEL_RELEASE}/updates")]:
+                for root, _dirs, files in os.walk(search_dir):
+                    for name in files:
+                        if name.endswith(".bak"):
+                            src = os.path.join(root, name)
+                            os.rename(src, src[:-4])
+                            restored_count += 1
             if restored_count == 0 and not messages:
                 if self.config.get("install_type") == "temporary":
-                    subprocess.run(["modprobe", "-r", "hp-wmi"], check=False)
-                    subprocess.run(["modprobe", "hp-wmi"], check=False)
+                    _run(["modprobe", "-r", "hp-wmi"], check=False)
+                    _run(["modprobe", "hp-wmi"], check=False)
                     self.config.pop("install_type", None)
                     self.save_config()
+                    self._find_paths()
                     return True, "Temporary driver unloaded. (No backups needed)"
                 return False, "No backup files (.bak) found to restore."
-            subprocess.run(["depmod", "-a"], check=True)
-            subprocess.run(["modprobe", "-r", "hp-wmi"], check=False)
-            subprocess.run(["modprobe", "hp-wmi"], check=True)
+            _run(["depmod", "-a"], check=True)
+            _run(["modprobe", "-r", "hp-wmi"], check=False)
+            _run(["modprobe", "hp-wmi"], check=True)
             self.config.pop("install_type", None)
             self.save_config()
             if restored_count > 0:
                 messages.append(f"Restored {restored_count} driver backup(s).")
             messages.append("Driver reloaded.")
+            self._find_paths()
             return True, " ".join(messages)
         except subprocess.CalledProcessError as e:
             return False, f"Error restoring driver: {e}"